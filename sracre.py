@@ -4,17 +4,41 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QListWidget,
                              QComboBox, QLabel, QScrollArea, QGroupBox,
                              QMessageBox, QSlider, QLineEdit, QDialog,
                              QTextEdit, QFileDialog, QProgressBar)
-from PyQt6.QtCore import QSize, Qt, pyqtSignal, QPoint, QThread
-from PyQt6.QtGui import QIcon, QPixmap, QDragEnterEvent, QDropEvent, QMouseEvent, QTextCursor
+from PyQt6.QtCore import QSize, Qt, pyqtSignal, QPoint, QThread, QUrl
+from PyQt6.QtGui import (QIcon, QPixmap, QDragEnterEvent, QDropEvent, QMouseEvent, QTextCursor, QImage,
+                         QImageIOHandler, QImageReader, QDesktopServices)
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import copy
+import functools
+import json
 import random
+import re
+import secrets
+import shutil
+import signal
+import socket
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
 from typing import Optional
 import deepl
 import sqlite3
 import os
 import hashlib
+import hmac
+import math
+import wave
 import elevenlabs
 import ffmpeg
+import numpy
 
 
 class Keychain:
@@ -63,9 +87,43 @@ class Keychain:
 
 ICON_SIZE = 128
 IMAGE_EXT = ('.jpg', '.jpeg', '.png', '.webp')
-OUT_DIRS = ["output/audio", "output/videos", "output/clips", "output/done"]
+PROJECT_EXT = '.sracre'
+PROJECT_VERSION = 1
+PREVIEW_DIR = "output/preview"
+OUT_DIRS = ["output/audio", "output/pcm", "output/images", "output/videos", "output/tracks", "output/done", PREVIEW_DIR]
 DEEPL_QUOTA = 500000
 ELEVENLABS_QUOTA = 40000
+SAMPLE_RATE = 48000
+AUDIO_CHANNELS = 2
+LOUDNESS_TARGET = -20  # dBFS RMS
+PCM_CACHE_SIZE = 256  # decoded lines kept in memory, about 2 MB per 5 seconds of narration
+TTS_FORMAT = "mp3_44100_128"
+TTS_EXT = ".mp3"
+ARTIFACT_NAMESPACES = [directory.split("/")[-1] for directory in OUT_DIRS if directory != PREVIEW_DIR]
+ARTIFACT_NAME_PATTERN = re.compile(r"[0-9A-Za-z_-]+\.[0-9a-z]+")
+COORDINATOR_HOST = "127.0.0.1"  # workers on other machines need the coordinator bound to a public address
+MAX_SCALE = 2.0
+IMAGE_QUALITY = 95  # JPEG quality of prepared source images
+VIDEO_ENCODERS = {  # in order of preference, with the options each encoder runs with
+    "hevc_videotoolbox": {},
+    "libx264": {"preset": "fast"},  # several times faster than libx265 at the bitrate we render at
+    "libx265": {"preset": "fast"},
+}
+PREVIEW_FPS = 10
+PREVIEW_DIVISOR = 4  # previews are rendered at a quarter of each profile's size
+CHARS_PER_SECOND = 15  # speech rate used to guess the length of audio that was not generated yet
+STATS_WINDOW = 50
+DEFAULT_THROUGHPUT = {  # units per second: characters for translation and tts, frames for motion and concat
+    "translation": 1000,
+    "tts": 50,
+    "motion": 20,
+    "concat": 200,
+}
+OUTPUT_PROFILES = {
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+    "vertical": (1080, 1920),
+}
 
 fps = 30
 scale = 1.5
@@ -73,16 +131,69 @@ voice = "???"
 video_length = 15
 fade_duration = 0.25
 audio_padding = 0.75
+normalize_loudness = False
+fit_to_audio = False
+output_profiles = ["1080p"]
 
 deepl_keychain = Keychain("deepl")
 elevenlabs_keychain = Keychain("elevenlabs")
 
 translator: Optional[deepl.Translator] = None
+artifact_store: Optional["ArtifactStore"] = None
+coordinator: Optional["Coordinator"] = None
 selected_languages = []
 source_language = "???"
 target_texts = {}
 
 db = sqlite3.connect("sracre.db")
+db_local = threading.local()
+translators = {}
+fingerprints = {}
+job_local = threading.local()
+jobs_condition = threading.Condition()
+active_jobs = []
+
+
+def get_db():
+    if not hasattr(db_local, "db"):
+        db_local.db = sqlite3.connect("sracre.db")
+    return db_local.db
+
+
+def init_storage():
+    for directory in OUT_DIRS:
+        os.makedirs(directory, exist_ok=True)
+
+    # Audio used to be saved as MP3 data under a .wav name.
+    for name in os.listdir("output/audio"):
+        root, ext = os.path.splitext(name)
+        if ext == ".wav" and not os.path.exists(f"output/audio/{root}{TTS_EXT}"):
+            os.replace(f"output/audio/{name}", f"output/audio/{root}{TTS_EXT}")
+
+    cursor = db.cursor()
+    cursor.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS keys (api TEXT, key TEXT, quota_used INTEGER, "
+                   "quota_total INTEGER, reset_time INTEGER)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS translations (text_hash TEXT, target_lang TEXT, target_text "
+                   "TEXT, PRIMARY KEY (text_hash, target_lang))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS stats (stage TEXT, units REAL, seconds REAL)")
+    db.commit()
+
+
+def record_stage(stage, units, seconds):
+    # Draft previews render far faster than real jobs, timing them would make estimates too optimistic.
+    if is_preview():
+        return
+    db_ = get_db()
+    db_.cursor().execute("INSERT INTO stats (stage, units, seconds) VALUES (?, ?, ?)", (stage, units, seconds))
+    db_.commit()
+
+
+def get_throughput(stage):
+    units, seconds = get_db().cursor().execute("SELECT SUM(units), SUM(seconds) FROM (SELECT units, seconds FROM stats "
+                                               "WHERE stage = ? ORDER BY rowid DESC LIMIT ?)",
+                                               (stage, STATS_WINDOW)).fetchone()
+    return units / seconds if seconds else DEFAULT_THROUGHPUT[stage]
 
 
 def get_settings():
@@ -102,25 +213,578 @@ def get_hash(items):
     return hash_.hexdigest()
 
 
-def generate_audio(line):
-    path = f"output/audio/{get_hash([line, voice])}.wav"
+def get_file_digest(path):
+    hash_ = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            hash_.update(chunk)
+    return hash_.hexdigest()
+
+
+def get_fingerprint(path):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in fingerprints:
+        fingerprints[key] = get_file_digest(path)
+    return fingerprints[key]
+
+
+class ArtifactStore:
+    class Error(Exception):
+        pass
+
+    DIGEST_HEADER = "X-Sracre-Sha256"
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, location, timeout=30, max_workers=8, headers=None):
+        self.location = location.rstrip("/")
+        self.is_http = location.startswith(("http://", "https://"))
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.headers = headers or {}
+
+    @staticmethod
+    def get_key(path):
+        namespace, name = os.path.normpath(path).split(os.sep)[-2:]
+        if namespace not in ARTIFACT_NAMESPACES or not ARTIFACT_NAME_PATTERN.fullmatch(name):
+            raise ArtifactStore.Error(f"\"{path}\" is not a cacheable artifact")
+        return namespace, name
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open_part(path, mode):
+        # Every writer gets its own temporary file, so concurrent uploads of one key never mix their data.
+        fd, part_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.",
+                                         suffix=".part")
+        try:
+            os.chmod(part_path, 0o644)
+            with os.fdopen(fd, mode) as f:
+                yield f, part_path
+        except BaseException:
+            os.remove(part_path)
+            raise
+
+    @staticmethod
+    def copy_verified(source, path, digest, length=None):
+        hash_ = hashlib.sha256()
+        with ArtifactStore.open_part(path, "wb") as (f, part_path):
+            while length is None or length > 0:
+                chunk = source.read(ArtifactStore.CHUNK_SIZE if length is None else min(ArtifactStore.CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                if length is not None:
+                    length -= len(chunk)
+                hash_.update(chunk)
+                f.write(chunk)
+        if hash_.hexdigest() != digest:
+            os.remove(part_path)
+            return False
+        os.replace(part_path, path)
+        return True
+
+    @staticmethod
+    def write_digest(path, digest):
+        # The digest names the size and mtime of the file it describes, so it is never trusted for another upload.
+        stat = os.stat(path)
+        with ArtifactStore.open_part(f"{path}.sha256", "w") as (f, part_path):
+            f.write(f"{digest} {stat.st_size} {stat.st_mtime_ns}")
+        os.replace(part_path, f"{path}.sha256")
+
+    @staticmethod
+    def read_digest(path):
+        # None means the file no longer matches the digest it was stored with, it is treated as missing.
+        try:
+            with open(f"{path}.sha256") as f:
+                digest, size, mtime_ns = f.read().split()
+            size, mtime_ns = int(size), int(mtime_ns)
+        except FileNotFoundError:
+            # Files that were never uploaded, like a coordinator's own output, have no digest to check against.
+            return get_fingerprint(path)
+        except ValueError:
+            print(f"Digest of \"{path}\" is unreadable, ignoring the file")
+            return None
+        stat = os.stat(path)
+        if (size, mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return digest
+        # Copying or touching the file changes only its mtime, a different hash means it was damaged.
+        if size != stat.st_size or get_file_digest(path) != digest:
+            print(f"\"{path}\" changed since it was stored, ignoring it")
+            return None
+        with contextlib.suppress(OSError):
+            ArtifactStore.write_digest(path, digest)
+        return digest
+
+    def fetch(self, path):
+        namespace, name = self.get_key(path)
+        try:
+            if self.is_http:
+                request = urllib.request.Request(f"{self.location}/{namespace}/{name}", headers=self.headers)
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    is_valid = self.copy_verified(response, path, response.headers.get(self.DIGEST_HEADER))
+            else:
+                remote_path = os.path.join(self.location, namespace, name)
+                digest = self.read_digest(remote_path)
+                if digest is None:
+                    return False
+                with open(remote_path, "rb") as f:
+                    is_valid = self.copy_verified(f, path, digest)
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                print(f"Remote cache error for \"{path}\": {e}")
+            return False
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Remote cache error for \"{path}\": {e}")
+            return False
+
+        if not is_valid:
+            print(f"Remote copy of \"{path}\" failed the integrity check, ignoring it.")
+            return False
+        print(f"Fetched \"{path}\" from remote cache")
+        return True
+
+    def store(self, path):
+        namespace, name = self.get_key(path)
+        digest = get_file_digest(path)
+        try:
+            if self.is_http:
+                with open(path, "rb") as f:
+                    request = urllib.request.Request(f"{self.location}/{namespace}/{name}", data=f, method="PUT",
+                                                     headers={**self.headers, self.DIGEST_HEADER: digest,
+                                                              "Content-Length": str(os.path.getsize(path))})
+                    urllib.request.urlopen(request, timeout=self.timeout).close()
+            else:
+                remote_path = os.path.join(self.location, namespace, name)
+                os.makedirs(os.path.dirname(remote_path), exist_ok=True)
+                with open(path, "rb") as f:
+                    self.copy_verified(f, remote_path, digest)
+                self.write_digest(remote_path, digest)
+        except OSError as e:
+            print(f"Could not upload \"{path}\" to remote cache: {e}")
+            return False
+        print(f"Uploaded \"{path}\" to remote cache")
+        return True
+
+    def exists(self, path):
+        namespace, name = self.get_key(path)
+        if not self.is_http:
+            return os.path.exists(os.path.join(self.location, namespace, name))
+        try:
+            request = urllib.request.Request(f"{self.location}/{namespace}/{name}", method="HEAD", headers=self.headers)
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise
+            return False
+        return True
+
+    def prefetch(self, paths):
+        missing = [path for path in paths if not os.path.exists(path)]
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            return sum(executor.map(self.fetch, missing))
+
+
+class ArtifactRequestHandler(BaseHTTPRequestHandler):
+    root = "cache"
+    persist_digests = True
+
+    def get_path(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in ARTIFACT_NAMESPACES or not ARTIFACT_NAME_PATTERN.fullmatch(parts[1]):
+            self.send_error(400, "Invalid artifact key")
+            return None
+        return os.path.join(self.root, *parts)
+
+    def do_HEAD(self):
+        self.send_artifact(with_body=False)
+
+    def do_GET(self):
+        self.send_artifact(with_body=True)
+
+    def send_artifact(self, with_body):
+        path = self.get_path()
+        if path is None:
+            return
+        try:
+            digest = ArtifactStore.read_digest(path)
+            if digest is None:
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                self.send_response(200)
+                self.send_header(ArtifactStore.DIGEST_HEADER, digest)
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.end_headers()
+                if with_body:
+                    shutil.copyfileobj(f, self.wfile, ArtifactStore.CHUNK_SIZE)
+        except FileNotFoundError:
+            self.send_error(404)
+
+    def do_PUT(self):
+        path = self.get_path()
+        if path is None:
+            return
+        digest = self.headers.get(ArtifactStore.DIGEST_HEADER, "")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if not ArtifactStore.copy_verified(self.rfile, path, digest, int(self.headers.get("Content-Length", 0))):
+                self.send_error(422, "Digest mismatch")
+                return
+            if self.persist_digests:
+                ArtifactStore.write_digest(path, digest)
+        except OSError as e:
+            self.send_error(500, f"Could not store artifact: {e}")
+            return
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def serve_artifacts(root, host, port):
+    ArtifactRequestHandler.root = root
+    server = ThreadingHTTPServer((host, port), ArtifactRequestHandler)
+    print(f"Serving artifact cache from \"{root}\" on {host}:{port}")
+    server.serve_forever()
+
+
+def set_artifact_store(location, headers=None):
+    global artifact_store
+    artifact_store = ArtifactStore(location, headers=headers) if location else None
+
+
+def artifact_exists(path):
+    if os.path.exists(path):
+        return True
+    return artifact_store is not None and not path.startswith(PREVIEW_DIR) and artifact_store.fetch(path)
+
+
+def artifact_cached(path):
+    # Planning only asks, the file is fetched when the render needs it.
     if os.path.exists(path):
+        return True
+    if artifact_store is None or path.startswith(PREVIEW_DIR):
+        return False
+    try:
+        return artifact_store.exists(path)
+    except ArtifactStore.Error:
+        return False
+    except OSError as e:
+        print(f"Could not look up \"{path}\" in the remote cache: {e}")
+        return False
+
+
+def publish_artifact(path):
+    if artifact_store is not None and not path.startswith(PREVIEW_DIR):
+        artifact_store.store(path)
+
+
+class Job:
+    class Cancelled(Exception):
+        pass
+
+    def __init__(self, name, priority=0, preview=False):
+        self.name = name
+        self.priority = priority
+        self.preview = preview
+        # A deep copy, the settings panel edits the language and profile lists in place.
+        self.settings = copy.deepcopy(get_render_settings(PROJECT_SETTINGS))
+        self.cancelled = threading.Event()
+        self.paused = False
+        self.processes = set()
+
+    def is_runnable(self):
+        return not self.paused and not any(job.priority > self.priority and not job.paused for job in active_jobs)
+
+    def raise_if_cancelled(self):
+        if self.cancelled.is_set():
+            raise Job.Cancelled(f"Job \"{self.name}\" was cancelled")
+
+    def checkpoint(self):
+        with jobs_condition:
+            self.raise_if_cancelled()
+            while not self.is_runnable():
+                jobs_condition.wait()
+                self.raise_if_cancelled()
+
+    def cancel(self):
+        with jobs_condition:
+            self.cancelled.set()
+            for process in self.processes:
+                process.kill()
+            jobs_condition.notify_all()
+
+    def set_paused(self, paused):
+        with jobs_condition:
+            self.paused = paused
+            update_jobs()
+
+
+def update_jobs():
+    # Running ffmpeg processes of paused or preempted jobs are stopped until their job may run again.
+    with jobs_condition:
+        for job in active_jobs:
+            for process in job.processes:
+                process.send_signal(signal.SIGCONT if job.is_runnable() else signal.SIGSTOP)
+        jobs_condition.notify_all()
+
+
+def get_current_job():
+    return getattr(job_local, "job", None)
+
+
+def is_preview():
+    job = get_current_job()
+    return job is not None and job.preview
+
+
+def get_setting(name):
+    # Jobs keep the settings they were started with, changing them in the GUI only affects later jobs.
+    job = get_current_job()
+    return globals()[name] if job is None else job.settings[name]
+
+
+def get_fps():
+    return PREVIEW_FPS if is_preview() else get_setting("fps")
+
+
+def get_cache_dir(stage):
+    # Draft previews keep all of their artifacts apart from the real ones.
+    return PREVIEW_DIR if is_preview() else f"output/{stage}"
+
+
+def checkpoint():
+    job = get_current_job()
+    if job is not None:
+        job.checkpoint()
+
+
+def bind_job(function):
+    job = get_current_job()
+
+    def run_in_job(*args):
+        job_local.job = job
+        try:
+            return function(*args)
+        finally:
+            job_local.job = None
+
+    return run_in_job
+
+
+def run_job(job, function, *args):
+    with jobs_condition:
+        active_jobs.append(job)
+        update_jobs()
+    job_local.job = job
+    try:
+        return function(*args)
+    finally:
+        job_local.job = None
+        with jobs_condition:
+            active_jobs.remove(job)
+            update_jobs()
+
+
+def get_memory_size():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 8 * 2 ** 30
+
+
+class ResourceGovernor:
+    # Every ffmpeg process takes a share of one CPU and memory budget. How many processes of a stage may run at once
+    # follows their measured combined throughput: one more is allowed while it keeps rising and one less once it drops.
+    MEMORY_CLASSES = {"light": 256 * 2 ** 20, "heavy": 2 * 2 ** 30}
+    STAGE_MEMORY = {"decode": "light", "motion": "heavy", "concat": "heavy"}
+    # Audio decoding runs on one thread and is brief, it never waits for a share of the CPU budget.
+    SINGLE_THREADED_STAGES = {"decode"}
+    SMOOTHING = 0.3
+    TOLERANCE = 0.95
+
+    class Reservation:
+        def __init__(self, job, stage, cpu_share, memory):
+            self.job = job
+            self.stage = stage
+            self.cpu_share = cpu_share
+            self.memory = memory
+
+    def __init__(self, cpus, memory):
+        self.cpus = cpus
+        self.memory = memory
+        self.condition = threading.Condition()
+        self.reservations = []
+        self.limits = {stage: 1 for stage in self.STAGE_MEMORY}
+        self.rates = {stage: {} for stage in self.STAGE_MEMORY}  # concurrency -> combined units per second
+
+    def get_max_limit(self, stage):
+        return max(1, min(self.cpus, self.memory // self.MEMORY_CLASSES[self.STAGE_MEMORY[stage]]))
+
+    def get_threads(self, stage):
+        if stage in self.SINGLE_THREADED_STAGES:
+            return 1
+        return max(1, self.cpus // self.limits[stage])
+
+    def get_cpu_share(self, stage):
+        return 0 if stage in self.SINGLE_THREADED_STAGES else self.get_threads(stage)
+
+    def can_start(self, stage, cpu_share, memory):
+        # Processes of paused or preempted jobs are stopped, so they leave their share to the others.
+        running = [reservation for reservation in self.reservations
+                   if reservation.job is None or reservation.job.is_runnable()]
+        if not running:
+            return True
+        return (sum(reservation.stage == stage for reservation in running) < self.limits[stage]
+                and sum(reservation.cpu_share for reservation in running) + cpu_share <= self.cpus
+                and sum(reservation.memory for reservation in running) + memory <= self.memory)
+
+    def report(self, stage, rate, concurrency):
+        limit = self.limits[stage]
+        if concurrency < limit:
+            # Stages that were not using their whole limit say nothing about it.
+            return
+        rates = self.rates[stage]
+        combined = rate * concurrency
+        rates[limit] = combined if limit not in rates else rates[limit] + self.SMOOTHING * (combined - rates[limit])
+        if limit > 1 and rates[limit] < rates.get(limit - 1, 0) * self.TOLERANCE:
+            self.limits[stage] = limit - 1
+        elif limit < self.get_max_limit(stage) and rates.get(limit + 1, math.inf) > rates[limit]:
+            self.limits[stage] = limit + 1
+
+    @contextlib.contextmanager
+    def reserve(self, stage, units):
+        job = get_current_job()
+        memory = self.MEMORY_CLASSES[self.STAGE_MEMORY[stage]]
+        with self.condition:
+            while not self.can_start(stage, self.get_cpu_share(stage), memory):
+                if job is not None:
+                    job.raise_if_cancelled()
+                # Jobs can be paused or resumed without notifying the governor.
+                self.condition.wait(1)
+            reservation = ResourceGovernor.Reservation(job, stage, self.get_cpu_share(stage), memory)
+            threads = self.get_threads(stage)
+            self.reservations.append(reservation)
+            concurrency = sum(reservation.stage == stage for reservation in self.reservations)
+        start_time = time.monotonic()
+        try:
+            yield threads
+            with self.condition:
+                self.report(stage, units / max(time.monotonic() - start_time, 0.001), concurrency)
+        finally:
+            with self.condition:
+                self.reservations.remove(reservation)
+                self.condition.notify_all()
+
+
+resource_governor = ResourceGovernor(os.cpu_count() or 1, get_memory_size())
+
+
+def run_ffmpeg(stream, capture_stdout=False, threads=None):
+    checkpoint()
+    job = get_current_job()
+    args = stream.compile(overwrite_output=True)
+    if threads is not None:
+        # Global options are ignored after the last output, so this goes right after the executable.
+        args[1:1] = ["-filter_complex_threads", str(threads)]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE if capture_stdout else None, stderr=subprocess.PIPE)
+    if job is not None:
+        with jobs_condition:
+            job.processes.add(process)
+            if job.cancelled.is_set():
+                process.kill()
+            elif not job.is_runnable():
+                process.send_signal(signal.SIGSTOP)
+    try:
+        out, err = process.communicate()
+    finally:
+        if job is not None:
+            with jobs_condition:
+                job.processes.discard(process)
+    if job is not None:
+        job.raise_if_cancelled()
+    if process.returncode != 0:
+        raise ffmpeg.Error('ffmpeg', out, err)
+    return out
+
+
+@contextlib.contextmanager
+def partial_outputs(*paths):
+    # Outputs are written next to their final path and only moved there once complete, so an interrupted
+    # render never leaves a truncated file in the cache. Each call gets its own names, so two renders of the
+    # same output never write to one file. The extension is kept because ffmpeg picks the format from it.
+    part_paths = []
+    try:
+        for path in paths:
+            root, ext = os.path.splitext(path)
+            fd, part_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(root)}.",
+                                             suffix=f".part{ext}")
+            os.close(fd)
+            os.chmod(part_path, 0o644)
+            part_paths.append(part_path)
+        yield part_paths
+    except BaseException:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        raise
+    for (part_path, path) in zip(part_paths, paths):
+        os.replace(part_path, path)
+
+
+def get_audio_path(line):
+    return f"output/audio/{get_hash([line, get_setting('voice')])}{TTS_EXT}"
+
+
+def generate_placeholder_audio(line):
+    path = f"{PREVIEW_DIR}/{get_hash([line, CHARS_PER_SECOND])}.wav"
+    if not os.path.exists(path):
+        with partial_outputs(path) as (part_path,):
+            write_wav(part_path, numpy.zeros((int(len(line) / CHARS_PER_SECOND * SAMPLE_RATE), AUDIO_CHANNELS)))
+    return path
+
+
+def fetch_legacy_audio(path):
+    # Remote caches can still hold audio under the old .wav name, it is moved to the new name on first use.
+    legacy_path = f"{os.path.splitext(path)[0]}.wav"
+    if artifact_store is None or not artifact_store.fetch(legacy_path):
+        return False
+    os.replace(legacy_path, path)
+    publish_artifact(path)
+    return True
+
+
+def generate_audio(line):
+    path = get_audio_path(line)
+    if artifact_exists(path) or fetch_legacy_audio(path):
         print(f"Audio for \"{line}\" already exists. Remove it to regenerate.")
         return path
+    if is_preview():
+        return generate_placeholder_audio(line)
 
+    checkpoint()
     print("Generating audio for:", line)
-    db_ = sqlite3.connect("sracre.db")
+    start_time = time.monotonic()
+    db_ = get_db()
     key = elevenlabs_keychain.get_key(db_, len(line))
     elevenlabs.set_api_key(key.key)
 
-    audio = elevenlabs.generate(
+    audio_stream = elevenlabs.generate(
         text=line,
-        voice=voice,
+        voice=get_setting("voice"),
         model="eleven_multilingual_v2",
+        stream=True,
+        output_format=TTS_FORMAT,
     )
-    with open(path, "wb") as f:
-        f.write(audio)
+    job = get_current_job()
+    with partial_outputs(path) as (part_path,), open(part_path, "wb") as f:
+        for chunk in audio_stream:
+            if job is not None:
+                job.raise_if_cancelled()
+            f.write(chunk)
     print("Saved audio to:", path)
+    record_stage("tts", len(line), time.monotonic() - start_time)
+    publish_artifact(path)
 
     user_info = elevenlabs.User.from_api().subscription
     elevenlabs_keychain.update_quota(db_, key.key, user_info.character_count, user_info.character_limit,
@@ -142,94 +806,610 @@ def get_next_pan_directions():
     return pan_directions
 
 
-def generate_video(image):
-    with open(image, "rb") as f:
-        output_path = f"output/videos/{get_hash([f.read(), scale, video_length, fps])}.mp4"
-    if os.path.exists(output_path):
-        print(f"Video for \"{image}\" already exists. Remove it to regenerate.")
+@functools.lru_cache(maxsize=None)
+def get_video_encoder():
+    # Hardware HEVC is only available on macOS, other machines fall back to software encoders.
+    try:
+        encoders = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True).stdout
+    except OSError:
+        return "libx264"
+    available = {line.split()[1] for line in encoders.splitlines() if len(line.split()) > 1}
+    return next((encoder for encoder in VIDEO_ENCODERS if encoder in available), "libx264")
+
+
+def get_video_frames():
+    return int(get_setting("video_length") * get_fps())
+
+
+def get_profile_size(profile):
+    width, height = OUTPUT_PROFILES[profile]
+    if is_preview():
+        return width // PREVIEW_DIVISOR, height // PREVIEW_DIVISOR
+    return width, height
+
+
+def get_master_size(profiles):
+    # The motion clip is rendered once at 16:9, tall enough for every variant to be cropped from it.
+    height = max(get_profile_size(profile)[1] for profile in profiles)
+    return math.ceil(height * 16 / 9 / 2) * 2, height
+
+
+def crop_to_profile(stream, profile):
+    width, height = get_profile_size(profile)
+    stream = stream.filter('crop', f"min(iw,ih*{width}/{height})", f"min(ih,iw*{height}/{width})")
+    return stream.filter('scale', width, height).filter('setsar', 1)
+
+
+def prepare_image(image):
+    # Sources are decoded once into an upright RGB image just large enough for the strongest zoom.
+    master_width, master_height = get_master_size(get_setting("output_profiles"))
+    width, height = math.ceil(master_width * MAX_SCALE), math.ceil(master_height * MAX_SCALE)
+    output_path = f"{get_cache_dir('images')}/{get_hash([get_fingerprint(image), width, height])}.jpg"
+    if artifact_exists(output_path):
         return output_path
 
-    total_frames = int(video_length * fps)
-    zoom_increment = (scale - 1) / total_frames
-    pan_directions = get_next_pan_directions()
-    zoompan_filter = (
-        "scale=8000:-1,"
-        f"zoompan=z='min(zoom+{zoom_increment:.10f},{scale})'"
-        f":x='(x+{pan_directions[0]})/a*on'"
-        f":y='(y+{pan_directions[1]})*on'"
-        f":d={total_frames}"
-        ":s=1920x1080"
-    )
-    print(f"Generating clip from \"{image}\" with end scale {scale} and duration {video_length}")
-    (
-        ffmpeg.input(image)
-        .output(output_path, vcodec='hevc_videotoolbox', t=video_length, vf=zoompan_filter, pix_fmt='yuv420p', r=fps, video_bitrate='8000k')
-        .run(quiet=True)
-    )
-    print("Saved clip to:", output_path)
+    print(f"Preparing image \"{image}\"")
+    reader = QImageReader(image)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        source_width, source_height = size.width(), size.height()
+        if reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90:
+            source_width, source_height = source_height, source_width
+        factor = max(width / source_width, height / source_height)
+        if factor < 1:
+            reader.setScaledSize(QSize(math.ceil(size.width() * factor), math.ceil(size.height() * factor)))
+    image_data = reader.read()
+    if image_data.isNull():
+        raise ValueError(f"Could not read image \"{image}\": {reader.errorString()}")
+
+    with partial_outputs(output_path) as (part_path,):
+        if not image_data.convertToFormat(QImage.Format.Format_RGB888).save(part_path, "JPEG", IMAGE_QUALITY):
+            raise OSError(f"Could not save image to \"{part_path}\"")
+    publish_artifact(output_path)
     return output_path
 
 
-def merge_audio_video(audio_path, video_path):
-    audio_info = ffmpeg.probe(audio_path)
-    video_info = ffmpeg.probe(video_path)
-    audio_duration = float(audio_info['format']['duration'])
-    video_duration = float(video_info['format']['duration'])
-    total_duration = audio_duration + audio_padding
-    if video_duration < total_duration:
-        raise ValueError(f"Video is shorter than audio by {(total_duration - video_duration):.2f}s")
+def get_video_paths(image, frames):
+    key = [get_fingerprint(image), get_setting("scale"), get_setting("video_length"), get_fps(), frames]
+    return {profile: f"{get_cache_dir('videos')}/{get_hash(key + [get_profile_size(profile)])}.mp4"
+            for profile in get_setting("output_profiles")}
+
+
+def generate_video(image, frames):
+    output_paths = get_video_paths(image, frames)
+    missing = [profile for (profile, path) in output_paths.items() if not artifact_exists(path)]
+    if not missing:
+        print(f"Video for \"{image}\" already exists. Remove it to regenerate.")
+        return output_paths
 
+    # The zoom speed always follows video_length, so a shorter render matches the start of a full-length one.
+    scale_ = get_setting("scale")
+    zoom_increment = (scale_ - 1) / get_video_frames()
+    pan_directions = get_next_pan_directions()
+    master_width, master_height = get_master_size(missing)
+    duration = frames / get_fps()
+    if is_preview():
+        upscale_width, encoding = 8000 // PREVIEW_DIVISOR, {"vcodec": "libx264", "preset": "ultrafast", "crf": 30}
+    else:
+        encoder = get_video_encoder()
+        upscale_width, encoding = 8000, {"vcodec": encoder, **VIDEO_ENCODERS[encoder], "video_bitrate": "8000k"}
+    print(f"Generating clip from \"{image}\" with end scale {scale_} and duration {duration:.2f} ({', '.join(missing)})")
+    video = (
+        ffmpeg.input(prepare_image(image)).video
+        .filter('scale', upscale_width, -1)
+        .filter('zoompan', z=f"min(zoom+{zoom_increment:.10f},{scale_})", x=f"(x+{pan_directions[0]})/a*on",
+                y=f"(y+{pan_directions[1]})*on", d=frames, s=f"{master_width}x{master_height}")
+        .split()
+    )
+    with resource_governor.reserve("motion", frames) as threads:
+        start_time = time.monotonic()
+        # The encoders run side by side in one process, together they stay within its share.
+        encoder_threads = max(1, threads // len(missing))
+        with partial_outputs(*[output_paths[profile] for profile in missing]) as part_paths:
+            outputs = [crop_to_profile(video[i], profile).output(part_path, t=duration, pix_fmt='yuv420p',
+                                                                 r=get_fps(), threads=encoder_threads, **encoding)
+                       for (i, (profile, part_path)) in enumerate(zip(missing, part_paths))]
+            run_ffmpeg(ffmpeg.merge_outputs(*outputs), threads=threads)
+    record_stage("motion", frames, time.monotonic() - start_time)
+    print("Saved clip to:", ", ".join(output_paths[profile] for profile in missing))
+    for profile in missing:
+        publish_artifact(output_paths[profile])
+    return output_paths
+
+
+# Recently decoded lines, a track only needs its own lines and everything older is reloaded from disk.
+pcm_cache = collections.OrderedDict()
+pcm_cache_lock = threading.Lock()
+
+
+def get_pcm_path(audio_path):
+    # Placeholder narration is decoded next to the other preview artifacts, everything else into output/pcm.
+    directory = PREVIEW_DIR if audio_path.startswith(PREVIEW_DIR) else "output/pcm"
+    return f"{directory}/{os.path.splitext(os.path.basename(audio_path))[0]}.npy"
+
+
+def decode_audio(audio_path):
+    audio_name = os.path.splitext(os.path.basename(audio_path))[0]
+    with pcm_cache_lock:
+        if audio_name in pcm_cache:
+            pcm_cache.move_to_end(audio_name)
+            return pcm_cache[audio_name]
+
+    pcm_path = get_pcm_path(audio_path)
+    if os.path.exists(pcm_path):
+        pcm = numpy.load(pcm_path)
+    else:
+        print(f"Decoding audio \"{audio_name}\"")
+        with resource_governor.reserve("decode", 1) as threads:
+            out = run_ffmpeg(
+                ffmpeg.input(audio_path)
+                .output('pipe:', format='f32le', acodec='pcm_f32le', ac=AUDIO_CHANNELS, ar=SAMPLE_RATE, threads=threads),
+                capture_stdout=True, threads=threads
+            )
+        pcm = numpy.frombuffer(out, dtype=numpy.float32).reshape(-1, AUDIO_CHANNELS)
+        with partial_outputs(pcm_path) as (part_path,):
+            numpy.save(part_path, pcm)
+    with pcm_cache_lock:
+        pcm_cache[audio_name] = pcm
+        while len(pcm_cache) > PCM_CACHE_SIZE:
+            pcm_cache.popitem(last=False)
+    return pcm
+
+
+def get_sample_count(audio_path):
     audio_name = os.path.splitext(os.path.basename(audio_path))[0]
-    video_name = os.path.splitext(os.path.basename(video_path))[0]
-    output_path = f"output/clips/{get_hash([audio_name, video_name])}.mp4"
-    if os.path.exists(output_path):
-        print(f"Clip for \"{audio_name}\" and \"{video_name}\" already exists. Remove it to regenerate.")
+    with pcm_cache_lock:
+        if audio_name in pcm_cache:
+            return len(pcm_cache[audio_name])
+    pcm_path = get_pcm_path(audio_path)
+    if os.path.exists(pcm_path):
+        # Only the header is read, the samples stay on disk.
+        return numpy.load(pcm_path, mmap_mode="r").shape[0]
+    return len(decode_audio(audio_path))
+
+
+def get_clip_frames(audio_path):
+    audio_duration = get_sample_count(audio_path) / SAMPLE_RATE
+    return math.ceil((audio_duration + get_setting("audio_padding")) * get_fps())
+
+
+def apply_loudness(samples):
+    rms = numpy.sqrt(numpy.mean(numpy.square(samples)))
+    peak = numpy.max(numpy.abs(samples))
+    if rms == 0:
+        return samples
+    gain = min(10 ** (LOUDNESS_TARGET / 20) / rms, 1 / peak)
+    return samples * gain
+
+
+def apply_fades(samples):
+    fade_samples = min(int(get_setting("fade_duration") * SAMPLE_RATE), len(samples) // 2)
+    if fade_samples > 0:
+        ramp = numpy.linspace(0, 1, fade_samples, dtype=numpy.float32)[:, numpy.newaxis]
+        samples[:fade_samples] *= ramp
+        samples[-fade_samples:] *= ramp[::-1]
+    return samples
+
+
+def write_wav(path, samples):
+    pcm = (numpy.clip(samples, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, "wb") as f:
+        f.setnchannels(AUDIO_CHANNELS)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def build_audio_track(audio_paths):
+    audio_names = [os.path.splitext(os.path.basename(path))[0] for path in audio_paths]
+    key = audio_names + [get_setting("audio_padding"), get_setting("fade_duration"), get_fps(),
+                         get_setting("normalize_loudness"), SAMPLE_RATE]
+    output_path = f"{get_cache_dir('tracks')}/{get_hash(key)}.wav"
+    if artifact_exists(output_path):
+        print(f"Audio track \"{output_path}\" already exists. Remove it to regenerate.")
         return output_path
 
-    print(f"Merging audio \"{audio_name}\" and video \"{video_name}\"")
-    video_input = ffmpeg.input(video_path)
-    video_input = video_input.trim(start=0, end=total_duration)
+    print(f"Building audio track from {len(audio_paths)} lines")
+    padding_samples = int(get_setting("audio_padding") * SAMPLE_RATE)
+    segments = []
+    for audio_path in audio_paths:
+        checkpoint()
+        pcm = decode_audio(audio_path)
+        if get_setting("normalize_loudness"):
+            pcm = apply_loudness(pcm)
+
+        # Each segment spans exactly as many samples as its video clip has frames, so the track never drifts.
+        segment = numpy.zeros((get_clip_frames(audio_path) * SAMPLE_RATE // get_fps(), AUDIO_CHANNELS),
+                              dtype=numpy.float32)
+        audio_end = min(padding_samples + len(pcm), len(segment))
+        segment[padding_samples:audio_end] = pcm[:audio_end - padding_samples]
+        segments.append(apply_fades(segment))
+
+    with partial_outputs(output_path) as (part_path,):
+        write_wav(part_path, numpy.concatenate(segments))
+    print("Saved audio track to:", output_path)
+    publish_artifact(output_path)
+    return output_path
 
-    audio_input = ffmpeg.input(audio_path)
-    silent_audio = ffmpeg.input('anullsrc', f='lavfi', t=audio_padding)
-    concat_audio = ffmpeg.concat(silent_audio, audio_input, silent_audio, v=0, a=1).filter('atrim', duration=total_duration)
 
-    ffmpeg.output(video_input, concat_audio, output_path, vcodec='libx264', acodec='aac').run(quiet=True)
-    print(f"Saved clip to \"{output_path}\"")
-    return output_path
+def get_output_name(lang, text, images):
+    # Finished videos are keyed by everything that goes into them, a project only shares them with identical ones.
+    settings = get_render_settings([name for name in RENDER_SETTINGS if name != "output_profiles"] + ["fit_to_audio"])
+    fingerprints = [get_fingerprint(image) for image in images]
+    return f"{lang.split(' ')[0].lower()}_{get_hash([text, fingerprints, sorted(settings.items())])}"
+
+
+def get_done_path(filename):
+    return f"{get_cache_dir('done')}/{filename}.mp4"
 
 
 def concatenate_clips(clips, filename):
     video_filters = []
-    audio_filters = []
-    output_path = f"output/done/{filename}.mp4"
-    if os.path.exists(output_path):
+    output_path = get_done_path(filename)
+    if artifact_exists(output_path):
         print(f"Concatenated clip for \"{output_path}\" already exists. Remove it to regenerate.")
         return output_path
 
-    for clip in clips:
-        clip_input = ffmpeg.input(clip)
-
-        video = clip_input.video.filter('setpts', 'PTS-STARTPTS').filter('setsar', 1)
-        video = video.filter('fade', type='in', start_time=0, duration=fade_duration)
-        video = video.filter('fade', type='out', start_time=video_length - fade_duration, duration=fade_duration)
+    fade_duration_ = get_setting("fade_duration")
+    for (video_path, audio_path) in clips:
+        clip_frames = get_clip_frames(audio_path)
+        clip_duration = clip_frames / get_fps()
+        video = ffmpeg.input(video_path).video.trim(end_frame=clip_frames)
+        video = video.filter('setpts', 'PTS-STARTPTS').filter('setsar', 1)
+        video = video.filter('fade', type='in', start_time=0, duration=fade_duration_)
+        video = video.filter('fade', type='out', start_time=clip_duration - fade_duration_, duration=fade_duration_)
         video_filters.append(video)
 
-        audio = clip_input.audio.filter('afade', type='in', start_time=0, duration=fade_duration)
-        audio = audio.filter('afade', type='out', start_time=video_length - fade_duration, duration=fade_duration)
-        audio_filters.append(audio)
+    audio_track = build_audio_track([audio_path for (_, audio_path) in clips])
 
     print("Concatenating clips...")
     concatenated_video = ffmpeg.concat(*video_filters, v=1, a=0)
-    concatenated_audio = ffmpeg.concat(*audio_filters, v=0, a=1)
-    ffmpeg.output(concatenated_video, concatenated_audio, output_path).run(quiet=True)
+    encoding = {"preset": "ultrafast", "crf": 30} if is_preview() else {}
+    frames = sum(get_clip_frames(audio_path) for (_, audio_path) in clips)
+    with resource_governor.reserve("concat", frames) as threads:
+        start_time = time.monotonic()
+        with partial_outputs(output_path) as (part_path,):
+            run_ffmpeg(ffmpeg.output(concatenated_video, ffmpeg.input(audio_track).audio, part_path,
+                                     vcodec='libx264', acodec='aac', r=get_fps(), threads=threads, **encoding),
+                       threads=threads)
+    record_stage("concat", frames, time.monotonic() - start_time)
     print("Saved concatenated clip to:", output_path)
+    publish_artifact(output_path)
+    return output_path
 
 
-def create_clip(line, image):
-    video_file = generate_video(image)
+def create_clip(line, image, video_frames):
     audio_file = generate_audio(line)
-    return merge_audio_video(audio_file, video_file)
+    clip_frames = get_clip_frames(audio_file)
+    if clip_frames > video_frames:
+        raise ValueError(f"Video is shorter than audio by {(clip_frames - video_frames) / get_fps():.2f}s")
+    video_file = generate_video(image, video_frames)
+    return video_file, audio_file
+
+
+RENDER_SETTINGS = ["fps", "scale", "voice", "video_length", "fade_duration", "audio_padding", "normalize_loudness",
+                   "output_profiles"]
+PROJECT_SETTINGS = RENDER_SETTINGS + ["source_language", "selected_languages", "fit_to_audio"]
+
+
+def get_render_settings(names=RENDER_SETTINGS):
+    return {name: get_setting(name) for name in names}
+
+
+def apply_render_settings(settings, names=RENDER_SETTINGS):
+    globals().update((name, settings[name]) for name in names if name in settings)
+
+
+def get_task_outputs(kind, result):
+    return list(result.values()) if kind == "motion" else [result]
+
+
+def run_task(kind, args):
+    if kind == "motion":
+        return generate_video(args["image"], args["frames"])
+    if kind == "concat":
+        clips = [tuple(clip) for clip in args["clips"]]
+        if artifact_store is not None:
+            artifact_store.prefetch([path for clip in clips for path in clip])
+        return concatenate_clips(clips, args["filename"])
+    raise ValueError(f"Unknown task \"{kind}\"")
+
+
+class Coordinator:
+    class Error(Exception):
+        pass
+
+    class Task:
+        def __init__(self, task_id, kind, args):
+            self.task_id = task_id
+            self.kind = kind
+            self.args = args
+            self.worker = None
+            self.deadline = 0
+            self.attempts = 0
+            self.done = False
+            self.result = None
+            self.error = None
+
+    LEASE_TIMEOUT = 30
+    MAX_ATTEMPTS = 3
+    TOKEN_HEADER = "X-Sracre-Token"
+    WORKER_HEADER = "X-Sracre-Worker"
+
+    def __init__(self, host, port, token):
+        self.token = token
+        self.tasks = {}
+        self.pending = collections.deque()
+        self.inputs = {}
+        self.condition = threading.Condition()
+        handler = type("BoundCoordinatorRequestHandler", (CoordinatorRequestHandler,), {"coordinator": self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Coordinator listening on {host}:{port}")
+
+    def add_input(self, path):
+        stat = os.stat(path)
+        token = f"{get_hash([os.path.abspath(path), stat.st_size, stat.st_mtime])}{os.path.splitext(path)[1].lower()}"
+        self.inputs[token] = path
+        return token
+
+    def submit(self, kind, args):
+        with self.condition:
+            task = Coordinator.Task(len(self.tasks), kind, dict(args, settings=get_render_settings()))
+            self.tasks[task.task_id] = task
+            self.pending.append(task)
+            self.condition.notify_all()
+            return task
+
+    def requeue_expired(self):
+        now = time.monotonic()
+        for task in self.tasks.values():
+            if task.worker is not None and not task.done and task.deadline < now:
+                print(f"Worker \"{task.worker}\" stopped responding, requeueing task {task.task_id}")
+                self.release(task, "lease expired")
+
+    def release(self, task, error):
+        task.worker = None
+        if task.attempts >= Coordinator.MAX_ATTEMPTS:
+            task.done = True
+            task.error = error
+        else:
+            self.pending.append(task)
+        self.condition.notify_all()
+
+    def lease(self, worker):
+        with self.condition:
+            self.requeue_expired()
+            if not self.pending:
+                return None
+            task = self.pending.popleft()
+            task.worker = worker
+            task.attempts += 1
+            task.deadline = time.monotonic() + Coordinator.LEASE_TIMEOUT
+            print(f"Task {task.task_id} ({task.kind}) leased to \"{worker}\"")
+            return task
+
+    def get_leased(self, task_id, worker):
+        task = self.tasks.get(task_id)
+        if task is None or task.done or task.worker != worker:
+            raise Coordinator.Error(f"Task {task_id} is not leased to \"{worker}\"")
+        return task
+
+    def may_upload(self, worker, key):
+        # Only workers holding a lease upload, and finished videos only for the concat task they were given.
+        namespace, _, name = key.partition("/")
+        with self.condition:
+            leased = [task for task in self.tasks.values() if task.worker == worker and not task.done]
+        if namespace == "done":
+            return any(task.kind == "concat" and os.path.basename(get_done_path(task.args["filename"])) == name
+                       for task in leased)
+        return bool(leased)
+
+    def heartbeat(self, task_id, worker):
+        with self.condition:
+            self.get_leased(task_id, worker).deadline = time.monotonic() + Coordinator.LEASE_TIMEOUT
+
+    def complete(self, task_id, worker, result, seconds):
+        with self.condition:
+            # A late result from a worker whose lease expired is still valid, the first one to arrive wins.
+            task = self.tasks.get(task_id)
+            if task is None or task.done:
+                return
+            # Workers upload their results to this node's output directory, a task is only done once they are here.
+            try:
+                missing = [path for path in get_task_outputs(task.kind, result)
+                           if not os.path.exists(os.path.join(CoordinatorRequestHandler.root,
+                                                              *ArtifactStore.get_key(path)))]
+            except (ArtifactStore.Error, AttributeError, TypeError, ValueError):
+                missing = [str(result)]
+            if missing:
+                error = f"Results of task {task_id} were not uploaded: {', '.join(missing)}"
+                if task.worker == worker:
+                    self.release(task, error)
+                raise Coordinator.Error(error)
+            if task in self.pending:
+                self.pending.remove(task)
+            task.worker = None
+            task.done = True
+            task.result = result
+            print(f"Task {task.task_id} ({task.kind}) finished by \"{worker}\" in {seconds:.2f}s")
+            self.condition.notify_all()
+
+    def fail(self, task_id, worker, error):
+        with self.condition:
+            task = self.get_leased(task_id, worker)
+            print(f"Task {task.task_id} ({task.kind}) failed on \"{worker}\": {error}")
+            self.release(task, error)
+
+    def run_tasks(self, tasks):
+        submitted = [self.submit(kind, args) for (kind, args) in tasks]
+        print(f"Waiting for workers to finish {len(submitted)} tasks...")
+        job = get_current_job()
+        with self.condition:
+            while not all(task.done for task in submitted):
+                if job is not None and job.cancelled.is_set():
+                    for task in submitted:
+                        if task in self.pending:
+                            self.pending.remove(task)
+                        task.done = True
+                    job.raise_if_cancelled()
+                self.condition.wait(timeout=1)
+                self.requeue_expired()
+        failed = [task for task in submitted if task.error is not None]
+        if failed:
+            raise Coordinator.Error(f"{len(failed)} tasks failed, last error: {failed[-1].error}")
+        return [task.result for task in submitted]
+
+
+class CoordinatorRequestHandler(ArtifactRequestHandler):
+    coordinator: Coordinator = None
+    root = "output"
+    # The local cache is regenerated by hand, digests are kept in memory and follow the files' size and mtime.
+    persist_digests = False
+
+    def is_authorized(self):
+        token = self.headers.get(Coordinator.TOKEN_HEADER, "")
+        if hmac.compare_digest(token.encode(), self.coordinator.token.encode()):
+            return True
+        self.send_error(403, "Invalid token")
+        return False
+
+    def do_HEAD(self):
+        if self.is_authorized():
+            super().do_HEAD()
+
+    def do_PUT(self):
+        if not self.is_authorized():
+            return
+        if not self.coordinator.may_upload(self.headers.get(Coordinator.WORKER_HEADER, ""), self.path.strip("/")):
+            self.send_error(403, "No task leased for this upload")
+            return
+        super().do_PUT()
+
+    def do_GET(self):
+        if not self.is_authorized():
+            return
+        if not self.path.startswith("/inputs/"):
+            return super().do_GET()
+        path = self.coordinator.inputs.get(self.path[len("/inputs/"):])
+        if path is None:
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            self.send_response(200)
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, ArtifactStore.CHUNK_SIZE)
+
+    def do_POST(self):
+        if not self.is_authorized():
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        try:
+            if self.path == "/lease":
+                task = self.coordinator.lease(request["worker"])
+                response = None if task is None else {"task": task.task_id, "kind": task.kind, "args": task.args}
+            elif self.path == "/heartbeat":
+                response = self.coordinator.heartbeat(request["task"], request["worker"])
+            elif self.path == "/complete":
+                response = self.coordinator.complete(request["task"], request["worker"], request["result"],
+                                                     request["seconds"])
+            elif self.path == "/fail":
+                response = self.coordinator.fail(request["task"], request["worker"], request["error"])
+            else:
+                self.send_error(404)
+                return
+        except Coordinator.Error as e:
+            self.send_error(409, str(e))
+            return
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def post_json(url, payload, headers=None):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method="POST",
+                                     headers={**(headers or {}), "Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def run_worker(coordinator_url, name, token):
+    coordinator_url = coordinator_url.rstrip("/")
+    headers = {Coordinator.TOKEN_HEADER: token, Coordinator.WORKER_HEADER: name}
+    set_artifact_store(coordinator_url, headers)
+    os.makedirs("output/inputs", exist_ok=True)
+    print(f"Worker \"{name}\" waiting for tasks from {coordinator_url}")
+    while True:
+        try:
+            task = post_json(f"{coordinator_url}/lease", {"worker": name}, headers)
+        except OSError as e:
+            print(f"Could not reach coordinator: {e}")
+            time.sleep(5)
+            continue
+        if task is None:
+            time.sleep(1)
+            continue
+
+        stop_heartbeat = threading.Event()
+
+        def send_heartbeats():
+            while not stop_heartbeat.wait(Coordinator.LEASE_TIMEOUT / 3):
+                try:
+                    post_json(f"{coordinator_url}/heartbeat", {"worker": name, "task": task["task"]}, headers)
+                except OSError as e:
+                    print(f"Heartbeat failed: {e}")
+
+        threading.Thread(target=send_heartbeats, daemon=True).start()
+        start_time = time.monotonic()
+        try:
+            args = task["args"]
+            apply_render_settings(args["settings"])
+            if "image" in args:
+                image_path = f"output/inputs/{args['image']}"
+                if not os.path.exists(image_path):
+                    request = urllib.request.Request(f"{coordinator_url}/inputs/{args['image']}", headers=headers)
+                    with urllib.request.urlopen(request, timeout=30) as response, open(f"{image_path}.part", "wb") as f:
+                        shutil.copyfileobj(response, f, ArtifactStore.CHUNK_SIZE)
+                    os.replace(f"{image_path}.part", image_path)
+                args["image"] = image_path
+            result = run_task(task["kind"], args)
+            # Results that were cached on this worker were never uploaded, and uploads can fail.
+            for path in get_task_outputs(task["kind"], result):
+                if not artifact_store.exists(path) and not artifact_store.store(path):
+                    raise ArtifactStore.Error(f"Could not upload \"{path}\" to the coordinator")
+            stop_heartbeat.set()
+            post_json(f"{coordinator_url}/complete", {"worker": name, "task": task["task"], "result": result,
+                                                      "seconds": time.monotonic() - start_time}, headers)
+        except Exception as e:
+            stop_heartbeat.set()
+            print(f"Task {task['task']} failed: {e}")
+            try:
+                post_json(f"{coordinator_url}/fail", {"worker": name, "task": task["task"], "error": str(e)}, headers)
+            except OSError:
+                pass
+
+
+def get_coordinator_token():
+    # Workers have to present this token, it is generated once and kept with the settings.
+    token = get_settings().get("coordinator_token")
+    if not token:
+        token = secrets.token_urlsafe(24)
+        set_setting("coordinator_token", token)
+    return token
+
+
+def set_coordinator(port, host=COORDINATOR_HOST):
+    global coordinator
+    if coordinator is not None:
+        coordinator.server.shutdown()
+        coordinator.server.server_close()
+    coordinator = Coordinator(host, port, get_coordinator_token()) if port else None
 
 
 def get_voices():
@@ -248,6 +1428,102 @@ def set_keys():
     elevenlabs.set_api_key(elevenlabs_keychain.get_key(db, 0).key)
 
 
+def get_translator(key):
+    if key not in translators:
+        translators[key] = deepl.Translator(key)
+    return translators[key]
+
+
+def get_cached_translation(cursor, line, target):
+    try:
+        return cursor.execute("SELECT target_text FROM translations WHERE text_hash = ? AND target_lang = ?",
+                              (get_hash(line), target)).fetchone()[0]
+    except TypeError:
+        return None
+
+
+def translate_texts(text, targets, on_translated=None):
+    db_ = get_db()
+    cursor = db_.cursor()
+
+    text_len = sum([len(line) for target in targets for line in text
+                    if get_cached_translation(cursor, line, target) is None])
+    key = deepl_keychain.get_key(db_, text_len)
+    translator_ = get_translator(key.key)
+
+    target_langs = {lang.name: lang for lang in translator_.get_target_languages()}
+    source_language_ = get_setting("source_language")
+    source_lang = {lang.name: lang for lang in translator_.get_source_languages()}[source_language_]
+
+    start_time = time.monotonic()
+    translations = {}
+    for target in targets:
+        lines = []
+        from_db_count = 0
+        print(f"Translating to \"{target}\" from \"{source_language_}\"")
+        for line in text:
+            cached = get_cached_translation(cursor, line, target)
+            if cached is not None:
+                lines.append(cached)
+                from_db_count += 1
+                continue
+
+            checkpoint()
+            translation = translator_.translate_text(line, source_lang=source_lang,
+                                                     target_lang=target_langs[target])
+            lines.append(translation.text)
+            cursor.execute("INSERT INTO translations (text_hash, target_lang, target_text) VALUES (?, ?, ?)", (get_hash(line), target, translation.text))
+        translations[target] = lines
+        print(f"Translated {len(lines)} lines (used {from_db_count} from db)")
+        if on_translated is not None:
+            on_translated(target, lines)
+    db_.commit()
+    if text_len > 0:
+        record_stage("translation", text_len, time.monotonic() - start_time)
+
+    usage = translator_.get_usage()
+    quota_curr = int(usage.character.count)
+    quota_total = int(usage.character.limit)
+    deepl_keychain.update_quota(db_, key.key, quota_curr, quota_total, 0)
+    return translations
+
+
+def load_settings():
+    settings = get_settings()
+    global source_language, selected_languages, fps, scale, voice, video_length, fade_duration, audio_padding, \
+        normalize_loudness, fit_to_audio, output_profiles
+    if "source_language" in settings:
+        source_language = settings["source_language"]
+    if "selected_languages" in settings:
+        languages = settings["selected_languages"].split(",")
+        if languages != [""]:
+            selected_languages = languages
+    if "fps" in settings:
+        fps = int(settings["fps"])
+    if "scale" in settings:
+        scale = float(settings["scale"])
+    if "voice" in settings:
+        voice = settings["voice"]
+    if "video_length" in settings:
+        video_length = int(settings["video_length"])
+    if "fade_duration" in settings:
+        fade_duration = float(settings["fade_duration"])
+    if "audio_padding" in settings:
+        audio_padding = float(settings["audio_padding"])
+    if "normalize_loudness" in settings:
+        normalize_loudness = settings["normalize_loudness"] == "1"
+    if "fit_to_audio" in settings:
+        fit_to_audio = settings["fit_to_audio"] == "1"
+    if "output_profiles" in settings:
+        profiles = [profile for profile in settings["output_profiles"].split(",") if profile in OUTPUT_PROFILES]
+        if profiles:
+            output_profiles = profiles
+    if "remote_cache" in settings:
+        set_artifact_store(settings["remote_cache"])
+    if settings.get("coordinator_port"):
+        set_coordinator(int(settings["coordinator_port"]), settings.get("coordinator_host") or COORDINATOR_HOST)
+
+
 class TranslationThread(QThread):
     translation_done = pyqtSignal(str)
     has_error = pyqtSignal(Exception)
@@ -257,51 +1533,20 @@ class TranslationThread(QThread):
         self.text = text
         self.targets = targets
         self.error = None
+        self.job = Job("translation", priority=1)
 
     def run(self):
         try:
-            db_ = sqlite3.connect("sracre.db")
-
-            text_len = sum([len(line) for line in self.text]) * len(self.targets)
-            key = deepl_keychain.get_key(db_, text_len)
-            translator_ = deepl.Translator(key.key)
-
-            target_langs = {lang.name: lang for lang in translator_.get_target_languages()}
-            source_lang = {lang.name: lang for lang in translator_.get_source_languages()}[source_language]
-
-            cursor = db_.cursor()
-            global target_texts
-            for target in self.targets:
-                lines = []
-                from_db_count = 0
-                print(f"Translating to \"{target}\" from \"{source_language}\"")
-                for line in self.text:
-                    line_hash = get_hash(line)
-                    try:
-                        result = cursor.execute("SELECT target_text FROM translations WHERE text_hash = ? AND "
-                                                "target_lang = ?", (line_hash, target)).fetchone()
-                        lines.append(result[0])
-                        from_db_count += 1
-                        continue
-                    except TypeError:
-                        pass
-
-                    translation = translator_.translate_text(line, source_lang=source_lang,
-                                                             target_lang=target_langs[target])
-                    lines.append(translation.text)
-                    cursor.execute("INSERT INTO translations (text_hash, target_lang, target_text) VALUES (?, ?, ?)", (line_hash, target, translation.text))
-                target_texts[target] = lines
-                print(f"Translated {len(lines)} lines (used {from_db_count} from db)")
-                self.translation_done.emit(target)
-            db_.commit()
-
-            usage = translator_.get_usage()
-            quota_curr = int(usage.character.count)
-            quota_total = int(usage.character.limit)
-            deepl_keychain.update_quota(db_, key.key, quota_curr, quota_total, 0)
+            run_job(self.job, translate_texts, self.text, self.targets, self.on_translated)
+        except Job.Cancelled:
+            pass
         except Exception as e:
             self.has_error.emit(e)
 
+    def on_translated(self, target, lines):
+        target_texts[target] = lines
+        self.translation_done.emit(target)
+
 
 class TranslationWindow(QDialog):
     def __init__(self, text):
@@ -371,36 +1616,377 @@ class TranslationWindow(QDialog):
     def on_translation_error(self, error):
         QMessageBox.critical(self, "Error", str(error))
 
+    def reject(self):
+        if hasattr(self, "worker"):
+            self.worker.job.cancel()
+        super().reject()
+
+
+def render_project(items, texts, on_progress):
+    texts = dict(texts)
+    texts[get_setting("source_language")] = [text for (_, text) in items]
+    images = [image for (image, _) in items]
+    # Previews are quick enough that handing them to workers would only slow them down.
+    coordinator_ = None if is_preview() else coordinator
+    if artifact_store is not None:
+        audio_paths = {get_audio_path(line) for text in texts.values() for line in text}
+        print(f"Fetched {artifact_store.prefetch(audio_paths)} audio files from remote cache")
+
+    progress = 0
+    progress_step = 95 / len(texts)
+    # Motion clips render in the background, as many at once as the resource governor lets through.
+    # Slides that share an image and length are rendered once.
+    with concurrent.futures.ThreadPoolExecutor(resource_governor.get_max_limit("motion")) as executor:
+        renders = {}
+        try:
+            if get_setting("fit_to_audio"):
+                # Narration comes first so every slide's motion clip is rendered only as long as its longest language.
+                # A slide starts rendering as soon as its narration is done, while later slides are still being
+                # synthesized.
+                progress_step /= 2
+                video_frames = []
+                for (i, image) in enumerate(images):
+                    print(f"\n----\nGenerating audio for slide {i + 1}")
+                    frames = 0
+                    for text in texts.values():
+                        progress += progress_step / len(text)
+                        on_progress(int(progress))
+                        checkpoint()
+                        frames = max(frames, get_clip_frames(generate_audio(text[i])))
+                    video_frames.append(frames)
+                    if coordinator_ is None and (image, frames) not in renders:
+                        renders[image, frames] = executor.submit(bind_job(generate_video), image, frames)
+            else:
+                video_frames = [get_video_frames()] * len(images)
+                if coordinator_ is None:
+                    print("\n----\nGenerating motion clips")
+                    frames = video_frames[0]
+                    for image in dict.fromkeys(images):
+                        renders[image, frames] = executor.submit(bind_job(generate_video), image, frames)
+                # Narration is synthesized while the pool renders, the clips below then find both cached.
+                progress_step /= 2
+                for (lang, text) in texts.items():
+                    print(f"\n----\nGenerating audio for \"{lang}\"")
+                    for line in text:
+                        progress += progress_step / len(text)
+                        on_progress(int(progress))
+                        checkpoint()
+                        generate_audio(line)
+            for render in renders.values():
+                render.result()
+        except BaseException:
+            # Queued renders are dropped, leaving the pool would otherwise wait for all of them to finish first.
+            for render in renders.values():
+                render.cancel()
+            raise
+
+    if coordinator_ is not None:
+        print("\n----\nDistributing motion clips to workers")
+        slides = {(image, frames) for (image, frames) in zip(images, video_frames)
+                  if not all(artifact_exists(path) for path in get_video_paths(image, frames).values())}
+        coordinator_.run_tasks([("motion", {"image": coordinator_.add_input(image), "frames": frames})
+                               for (image, frames) in slides])
+
+    outputs = []
+    concat_tasks = []
+    for (lang, text) in texts.items():
+        print(f"\n----\nCreating clips for \"{lang}\"")
+        clips = []
+        for (line, image, frames) in zip(text, images, video_frames):
+            progress_sub_step = progress_step / len(text)
+            progress += progress_sub_step
+            on_progress(int(progress))
+            checkpoint()
+            clips.append(create_clip(line, image, frames))
+        filename = get_output_name(lang, text, images)
+        for profile in get_setting("output_profiles"):
+            profile_clips = [(videos[profile], audio) for (videos, audio) in clips]
+            profile_filename = f"{filename}_{profile}"
+            outputs.append(get_done_path(profile_filename))
+            if coordinator_ is None:
+                concatenate_clips(profile_clips, profile_filename)
+            elif not artifact_exists(get_done_path(profile_filename)):
+                concat_tasks.append(("concat", {"clips": profile_clips, "filename": profile_filename}))
+    if concat_tasks:
+        print("\n----\nDistributing concatenation to workers")
+        coordinator_.run_tasks(concat_tasks)
+    print("\n----\nDone!")
+    on_progress(100)
+    return outputs
+
+
+class RenderPlan:
+    def __init__(self):
+        self.cached = collections.Counter()
+        self.uncached = collections.Counter()
+        self.units = collections.Counter()
+        self.quotas = []
+        self.quota_warnings = []
+        self.artifacts = {"audio": {}, "motion": [], "concat": {}}
+
+    def get_seconds(self):
+        # Throughput is measured per process, while motion clips render as many at once as the governor allows.
+        seconds = 0
+        for (stage, units) in self.units.items():
+            concurrency = min(resource_governor.limits[stage], self.uncached[stage]) if stage == "motion" else 1
+            seconds += units / (get_throughput(stage) * max(concurrency, 1))
+        return seconds
+
+    def check_quota(self, name, keychain, chars, single_key):
+        remaining = [key.quota_total - key.quota_used for key in keychain.get_all_keys(get_db())]
+        best_key = max(remaining, default=0)
+        if single_key and chars > best_key:
+            self.quota_warnings.append(f"{name} needs {chars} characters on one key but the best key has {best_key} left")
+        elif chars > sum(remaining):
+            self.quota_warnings.append(f"{name} needs {chars} characters but all keys have {sum(remaining)} left")
+        self.quotas.append(f"{name}: {chars} characters needed, {best_key} left on the best key "
+                           f"({sum(remaining)} in total)")
+
+    def to_dict(self):
+        return {"cached": dict(self.cached), "uncached": dict(self.uncached), "units": dict(self.units),
+                "seconds": round(self.get_seconds()), "quota_warnings": self.quota_warnings}
+
+    def summary(self):
+        seconds = round(self.get_seconds())
+        lines = [f"{stage.capitalize()}: {self.cached[stage]} cached, {self.uncached[stage]} to do"
+                 for stage in ("translation", "audio", "motion", "concat")]
+        lines.append(f"Estimated time: {seconds // 60}m {seconds % 60}s")
+        return "\n".join(lines + self.quotas + self.quota_warnings)
+
+
+def estimate_clip_frames(audio_path, line):
+    audio_name = os.path.splitext(os.path.basename(audio_path))[0]
+    if audio_name in pcm_cache or os.path.exists(get_pcm_path(audio_path)):
+        return get_clip_frames(audio_path)
+    return math.ceil((len(line) / CHARS_PER_SECOND + audio_padding) * fps)
+
+
+def plan_render(items, targets):
+    plan = RenderPlan()
+    cursor = get_db().cursor()
+    source_text = [text for (_, text) in items]
+    images = [image for (image, _) in items]
+
+    # Lines that are not translated yet stand in for their translation, they are only used to estimate lengths.
+    texts = {source_language: [(line, True) for line in source_text]}
+    for target in targets:
+        texts[target] = []
+        for line in source_text:
+            cached = get_cached_translation(cursor, line, target)
+            if cached is None:
+                plan.uncached["translation"] += 1
+                plan.units["translation"] += len(line)
+            else:
+                plan.cached["translation"] += 1
+            texts[target].append((line, False) if cached is None else (cached, True))
+
+    clip_frames = {}
+    for (lang, text) in texts.items():
+        clip_frames[lang] = []
+        plan.artifacts["audio"][lang] = [get_audio_path(line) if is_known else None for (line, is_known) in text]
+        for (line, is_known) in text:
+            audio_path = get_audio_path(line)
+            if is_known and artifact_cached(audio_path):
+                plan.cached["audio"] += 1
+            else:
+                plan.uncached["audio"] += 1
+                plan.units["tts"] += len(line)
+            clip_frames[lang].append(estimate_clip_frames(audio_path, line))
+
+    if fit_to_audio:
+        video_frames = [max(frames) for frames in zip(*clip_frames.values())]
+    else:
+        video_frames = [get_video_frames()] * len(images)
+    for (image, frames) in zip(images, video_frames):
+        video_paths = get_video_paths(image, frames)
+        plan.artifacts["motion"].append(video_paths)
+        if all(artifact_cached(path) for path in video_paths.values()):
+            plan.cached["motion"] += 1
+        else:
+            plan.uncached["motion"] += 1
+            plan.units["motion"] += frames
+
+    for lang in texts:
+        filename = get_output_name(lang, [line for (line, _) in texts[lang]], images)
+        plan.artifacts["concat"][lang] = {profile: get_done_path(f"{filename}_{profile}") for profile in output_profiles}
+        for profile in output_profiles:
+            if artifact_cached(get_done_path(f"{filename}_{profile}")):
+                plan.cached["concat"] += 1
+            else:
+                plan.uncached["concat"] += 1
+                plan.units["concat"] += sum(clip_frames[lang])
+
+    plan.check_quota("DeepL", deepl_keychain, plan.units["translation"], single_key=True)
+    plan.check_quota("ElevenLabs", elevenlabs_keychain, plan.units["tts"], single_key=False)
+    return plan
+
+
+def load_project(text_path, images):
+    with open(text_path, 'r') as file:
+        lines = [line.strip() for line in file if line.strip()]
+    if len(lines) != len(images):
+        raise ValueError(f"\"{text_path}\" has {len(lines)} lines for {len(images)} images")
+    return list(zip(images, lines))
+
+
+def save_project(path, items):
+    project_dir = os.path.dirname(os.path.abspath(path))
+    project = {
+        "version": PROJECT_VERSION,
+        "settings": get_render_settings(PROJECT_SETTINGS),
+        "items": [],
+        "artifacts": plan_render(items, selected_languages).artifacts,
+    }
+    for (image, text) in items:
+        stat = os.stat(image)
+        project["items"].append({"image": os.path.relpath(image, project_dir), "text": text,
+                                 "fingerprint": get_fingerprint(image), "size": stat.st_size,
+                                 "mtime": stat.st_mtime_ns})
+
+    with open(f"{path}.part", "w") as f:
+        json.dump(project, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(f"{path}.part", path)
+    print(f"Saved project to \"{path}\"")
+
+
+def load_project_file(path):
+    with open(path) as f:
+        project = json.load(f)
+    if project.get("version") != PROJECT_VERSION:
+        raise ValueError(f"\"{path}\" is not a version {PROJECT_VERSION} project")
+
+    # Known fingerprints are only trusted while the image's size and modification time still match.
+    project_dir = os.path.dirname(os.path.abspath(path))
+    items = []
+    for item in project["items"]:
+        image = os.path.normpath(os.path.join(project_dir, item["image"]))
+        fingerprints[(image, item["size"], item["mtime"])] = item["fingerprint"]
+        items.append((image, item["text"]))
+    missing = [image for (image, _) in items if not os.path.isfile(image)]
+    if missing:
+        raise ValueError(f"\"{path}\" uses images that no longer exist:\n" + "\n".join(missing))
+    return items, project["settings"]
+
+
+def load_project_dir(path):
+    files = sorted(os.listdir(path))
+    text_files = [name for name in files if name.lower().endswith('.txt')]
+    if len(text_files) != 1:
+        raise ValueError(f"\"{path}\" must contain exactly one .txt file")
+    images = [os.path.join(path, name) for name in files if name.lower().endswith(IMAGE_EXT)]
+    return load_project(os.path.join(path, text_files[0]), images)
+
+
+def find_projects(paths):
+    if paths[0].lower().endswith('.txt'):
+        return [(paths[0], lambda: (load_project(paths[0], paths[1:]), {}))]
+
+    projects = []
+    for path in paths:
+        if path.lower().endswith(PROJECT_EXT):
+            projects.append((path, functools.partial(load_project_file, path)))
+            continue
+        if any(name.lower().endswith('.txt') for name in os.listdir(path)):
+            project_dirs = [path]
+        else:
+            project_dirs = sorted(entry.path for entry in os.scandir(path) if entry.is_dir())
+        projects.extend((project_dir, lambda project_dir=project_dir: (load_project_dir(project_dir), {}))
+                        for project_dir in project_dirs)
+    return projects
+
+
+def print_event(event, **fields):
+    print(json.dumps({"event": event, **fields}), file=sys.__stdout__, flush=True)
+
+
+def render_batch(paths, json_output, plan_only=False, overrides=None):
+    emit = print_event if json_output else lambda event, **fields: None
+    projects = find_projects(paths)
+    base_settings = get_render_settings(PROJECT_SETTINGS)
+    failed = 0
+    job = None
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        print("Stopping, cancelling the current project...")
+        stopping.set()
+        if job is not None:
+            job.cancel()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    def render(name, items):
+        texts = translate_texts([text for (_, text) in items], selected_languages) if selected_languages else {}
+        return render_project(items, texts, lambda percent: emit("progress", project=name, percent=percent))
+
+    for (i, (name, load)) in enumerate(projects):
+        if stopping.is_set():
+            break
+        print(f"\n====\nRendering project \"{name}\" ({i + 1}/{len(projects)})")
+        emit("project_started", project=name, index=i, total=len(projects))
+        start_time = time.monotonic()
+        try:
+            items, settings = load()
+            for project_settings in (base_settings, settings, overrides or {}):
+                apply_render_settings(project_settings, PROJECT_SETTINGS)
+            if source_language == "???" or voice == "???":
+                raise ValueError("No source language or voice selected, pass --source-language and --voice")
+            if plan_only:
+                plan = plan_render(items, selected_languages)
+                print(plan.summary())
+                emit("plan", project=name, **plan.to_dict())
+                continue
+            job = Job(name)
+            outputs = run_job(job, render, name, items)
+        except Job.Cancelled:
+            failed += 1
+            print(f"Cancelled \"{name}\"")
+            emit("project_cancelled", project=name)
+            continue
+        except Exception as e:
+            failed += 1
+            print(f"Failed to render \"{name}\": {e}")
+            emit("project_failed", project=name, error=str(e))
+            continue
+        emit("project_done", project=name, outputs=outputs, seconds=round(time.monotonic() - start_time, 2))
+    emit("batch_done", total=len(projects), failed=failed)
+    return 1 if failed else 0
+
+
+class TaskThread(QThread):
+    done = pyqtSignal(object)
+    has_error = pyqtSignal(Exception)
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        try:
+            self.done.emit(self.fn(*self.args))
+        except OSError as e:
+            self.has_error.emit(e)
+
 
 class WorkerThread(QThread):
     has_error = pyqtSignal(Exception)
     progress = pyqtSignal(int)
+    rendered = pyqtSignal(list)
 
-    def __init__(self, items):
+    def __init__(self, items, priority=0, preview=False):
         super().__init__()
         self.items = items
+        self.job = Job("preview" if preview else "render", priority, preview)
 
     def run(self):
         try:
-            texts = target_texts
-            texts[source_language] = [text for (_, text) in self.items]
-            images = [image for (image, _) in self.items]
-
-            progress = 0
-            progress_step = 95 / len(texts)
-            for (lang, text) in texts.items():
-                print(f"\n----\nCreating clips for \"{lang}\"")
-                clips = []
-                for (line, image) in zip(text, images):
-                    progress_sub_step = progress_step / len(text)
-                    progress += progress_sub_step
-                    self.progress.emit(int(progress))
-                    clips.append(create_clip(line, image))
-                lang_name = lang.split(" ")[0].lower()
-                filename = f"{lang_name}_{get_hash(texts[source_language])}"
-                concatenate_clips(clips, filename)
-            print("\n----\nDone!")
-            self.progress.emit(100)
+            # Previews only show the source language, translating would cost quota.
+            texts = {} if self.job.preview else target_texts
+            self.rendered.emit(run_job(self.job, render_project, self.items, texts, self.progress.emit))
+        except Job.Cancelled:
+            print("\n----\nCancelled")
         except Exception as e:
             self.has_error.emit(e)
 
@@ -427,11 +2013,24 @@ class ListWidget(QListWidget):
         return icon_area.contains(click_position)
 
 
+def get_icon(path):
+    # Decoding straight to thumbnail size is much faster than loading the full image.
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        reader.setScaledSize(size.scaled(ICON_SIZE, ICON_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+    return QIcon(QPixmap.fromImage(reader.read()))
+
+
 class EditorWidget(QWidget):
+    project_loaded = pyqtSignal()
+
     def __init__(self):
         super().__init__()
 
-        self.worker = None
+        self.workers = []
+        self.tasks = []
         self.layout = QVBoxLayout(self)
         self.setLayout(self.layout)
         self.setAcceptDrops(True)
@@ -466,11 +2065,38 @@ class EditorWidget(QWidget):
         self.clear_button.clicked.connect(self.clear_with_confirm)
         self.buttons_layout.addWidget(self.clear_button)
 
+        self.open_button = QPushButton("Open Project")
+        self.open_button.clicked.connect(self.open_project)
+        self.buttons_layout.addWidget(self.open_button)
+
+        self.save_button = QPushButton("Save Project")
+        self.save_button.clicked.connect(self.save_project)
+        self.buttons_layout.addWidget(self.save_button)
+
+        self.preview_button = QPushButton("Preview")
+        self.preview_button.clicked.connect(self.start_preview)
+        self.buttons_layout.addWidget(self.preview_button)
+
         self.done_button = QPushButton("Start")
         self.done_button.clicked.connect(self.start_worker)
         self.done_button.setDefault(True)
         self.buttons_layout.addWidget(self.done_button, 1)
 
+        self.jobs_layout = QHBoxLayout()
+        self.layout.addLayout(self.jobs_layout)
+
+        self.urgent_checkbox = QCheckBox("Urgent (pauses other jobs)")
+        self.jobs_layout.addWidget(self.urgent_checkbox)
+
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setCheckable(True)
+        self.pause_button.toggled.connect(self.set_paused)
+        self.jobs_layout.addWidget(self.pause_button)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_with_confirm)
+        self.jobs_layout.addWidget(self.cancel_button)
+
         self.output_progress = QProgressBar()
         self.output_progress.setRange(0, 100)
         self.output_progress.setValue(0)
@@ -489,20 +2115,52 @@ class EditorWidget(QWidget):
                 self.add_image(path)
 
     def add_image(self, path):
-        pixmap = QPixmap(path)
-        icon = QIcon(pixmap)
-        item = QListWidgetItem(icon, self.get_next_text())
+        self.add_item(path, self.get_next_text())
+
+    def add_item(self, path, text):
+        item = QListWidgetItem(get_icon(path), text)
         item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
         self.list_widget.addItem(item)
         self.items.append((path, item.text()))
 
+    def open_project(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Project", "", f"Projects (*{PROJECT_EXT})")
+        if not path:
+            return
+        try:
+            items, settings = load_project_file(path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+
+        self.list_widget.clear()
+        self.items.clear()
+        self.text_list.clear()
+        for (image, text) in items:
+            self.add_item(image, text)
+        apply_render_settings(settings, PROJECT_SETTINGS)
+        self.project_loaded.emit()
+        self.run_task(TaskThread(plan_render, list(self.items), list(selected_languages)),
+                      lambda plan: print(f"Opened project \"{path}\"\n{plan.summary()}"))
+
+    def save_project(self):
+        if self.list_widget.count() == 0:
+            QMessageBox.warning(self, "Warning", "The list is empty")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Project", "", f"Projects (*{PROJECT_EXT})")
+        if not path:
+            return
+        if not path.lower().endswith(PROJECT_EXT):
+            path += PROJECT_EXT
+        self.run_task(TaskThread(save_project, path, list(self.items)), lambda _: print(f"Saved project \"{path}\""))
+
     def on_image_double_clicked(self, item):
         row = self.list_widget.row(item)
         ext_filter = f"Images ({' '.join(['*' + ext for ext in IMAGE_EXT])})"
         new_image_path, _ = QFileDialog.getOpenFileName(self, "Select Image", "", ext_filter)
         if new_image_path:
             self.items[row] = (new_image_path, self.items[row][1])
-            self.list_widget.item(row).setIcon(QIcon(QPixmap(new_image_path)))
+            self.list_widget.item(row).setIcon(get_icon(new_image_path))
 
     def get_next_text(self):
         return self.text_list.pop(0) if self.text_list else "???"
@@ -569,26 +2227,76 @@ class EditorWidget(QWidget):
         if voice == "???":
             QMessageBox.warning(self, "Warning", "No voice selected")
             return
-        if QMessageBox.question(self, "Confirm", "Are you sure you want to start?",
-                                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                QMessageBox.StandardButton.Yes) != QMessageBox.StandardButton.Yes:
+        if not output_profiles:
+            QMessageBox.warning(self, "Warning", "No output format selected")
             return
-
         for (image, text) in self.items:
             if text == "???":
                 QMessageBox.warning(self, "Warning", "Not all items have text")
                 return
 
+        # Planning hashes every image, the confirmation is shown once it is done.
+        self.run_task(TaskThread(plan_render, list(self.items), list(selected_languages)), self.confirm_start)
+
+    def confirm_start(self, plan):
+        if QMessageBox.question(self, "Confirm", f"{plan.summary()}\n\nAre you sure you want to start?",
+                                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                QMessageBox.StandardButton.Yes) != QMessageBox.StandardButton.Yes:
+            return
+
         if len(selected_languages) > 0:
             ex = TranslationWindow([text for (_, text) in self.items])
             if ex.exec() != QDialog.DialogCode.Accepted:
                 return
 
         print("Starting...")
-        self.worker = WorkerThread(self.items)
-        self.worker.has_error.connect(self.show_error_dialog)
-        self.worker.progress.connect(self.output_progress.setValue)
-        self.worker.start()
+        self.run_worker(WorkerThread(list(self.items), priority=1 if self.urgent_checkbox.isChecked() else 0))
+
+    def start_preview(self):
+        if self.list_widget.count() == 0:
+            QMessageBox.warning(self, "Warning", "The list is empty")
+            return
+        if not output_profiles:
+            QMessageBox.warning(self, "Warning", "No output format selected")
+            return
+
+        print("Starting preview...")
+        worker = WorkerThread(list(self.items), priority=1, preview=True)
+        worker.rendered.connect(lambda outputs: QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(outputs[0]))))
+        self.run_worker(worker)
+
+    def run_task(self, task, on_done):
+        task.done.connect(on_done)
+        task.has_error.connect(self.show_error_dialog)
+        task.finished.connect(lambda: self.tasks.remove(task))
+        self.tasks.append(task)
+        task.start()
+
+    def run_worker(self, worker):
+        worker.has_error.connect(self.show_error_dialog)
+        worker.progress.connect(self.output_progress.setValue)
+        worker.finished.connect(lambda: self.workers.remove(worker))
+        worker.job.set_paused(self.pause_button.isChecked())
+        self.workers.append(worker)
+        worker.start()
+
+    def set_paused(self, paused):
+        self.pause_button.setText("Resume" if paused else "Pause")
+        for worker in self.workers:
+            worker.job.set_paused(paused)
+
+    def cancel_with_confirm(self):
+        if not self.workers:
+            return
+        if QMessageBox.question(self, "Confirm Cancel", "Are you sure you want to cancel all running jobs?",
+                                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes:
+            self.cancel_all()
+
+    def cancel_all(self):
+        for worker in list(self.workers):
+            worker.job.cancel()
+            worker.wait()
 
     def show_error_dialog(self, error):
         QMessageBox.critical(self, "Error", str(error))
@@ -705,6 +2413,7 @@ class SettingsWidget(QWidget):
 
         self.fps_combo = QComboBox()
         self.fps_combo.addItems(["30", "60"])
+        self.fps_combo.setCurrentText(str(fps))
         self.fps_combo.currentTextChanged.connect(self.update_fps)
         self.layout.addWidget(self.fps_combo)
 
@@ -724,7 +2433,7 @@ class SettingsWidget(QWidget):
 
         self.scale_slider = QSlider(Qt.Orientation.Horizontal)
         self.scale_slider.setMinimum(100)
-        self.scale_slider.setMaximum(200)
+        self.scale_slider.setMaximum(int(MAX_SCALE * 100))
         self.scale_slider.setTickInterval(10)
         self.scale_slider.setSingleStep(10)
         self.scale_slider.setValue(int(scale * 100))
@@ -767,6 +2476,55 @@ class SettingsWidget(QWidget):
         self.audio_padding_slider.valueChanged.connect(self.update_audio_padding)
         self.layout.addWidget(self.audio_padding_slider)
 
+        self.loudness_checkbox = QCheckBox("Normalize loudness")
+        self.loudness_checkbox.setChecked(normalize_loudness)
+        self.loudness_checkbox.stateChanged.connect(self.update_normalize_loudness)
+        self.layout.addWidget(self.loudness_checkbox)
+
+        self.fit_to_audio_checkbox = QCheckBox("Fit clips to narration")
+        self.fit_to_audio_checkbox.setChecked(fit_to_audio)
+        self.fit_to_audio_checkbox.stateChanged.connect(self.update_fit_to_audio)
+        self.layout.addWidget(self.fit_to_audio_checkbox)
+
+        self.profiles_label = QLabel("Output formats:")
+        self.layout.addWidget(self.profiles_label)
+
+        self.profile_checkboxes = []
+        for profile in OUTPUT_PROFILES:
+            checkbox = QCheckBox(profile)
+            checkbox.setChecked(profile in output_profiles)
+            checkbox.stateChanged.connect(self.update_profiles)
+            self.profile_checkboxes.append(checkbox)
+            self.layout.addWidget(checkbox)
+
+        self.remote_cache_label = QLabel("Remote cache (URL or directory):")
+        self.layout.addWidget(self.remote_cache_label)
+
+        self.remote_cache_edit = QLineEdit()
+        self.remote_cache_edit.setPlaceholderText("Disabled")
+        self.remote_cache_edit.setText(artifact_store.location if artifact_store is not None else "")
+        self.remote_cache_edit.editingFinished.connect(self.update_remote_cache)
+        self.layout.addWidget(self.remote_cache_edit)
+
+        self.coordinator_label = QLabel("Distribute to workers on [address:]port:")
+        self.layout.addWidget(self.coordinator_label)
+
+        self.coordinator_edit = QLineEdit()
+        self.coordinator_edit.setPlaceholderText("Disabled")
+        if coordinator is not None:
+            host, port = coordinator.server.server_address[:2]
+            self.coordinator_edit.setText(str(port) if host == COORDINATOR_HOST else f"{host}:{port}")
+        self.coordinator_edit.editingFinished.connect(self.update_coordinator)
+        self.layout.addWidget(self.coordinator_edit)
+
+        self.coordinator_token_label = QLabel("Worker token:")
+        self.layout.addWidget(self.coordinator_token_label)
+
+        self.coordinator_token_edit = QLineEdit()
+        self.coordinator_token_edit.setReadOnly(True)
+        self.coordinator_token_edit.setText(coordinator.token if coordinator is not None else "")
+        self.layout.addWidget(self.coordinator_token_edit)
+
         self.api_keys_button = QPushButton("Edit API Keys")
         self.api_keys_button.clicked.connect(show_api_keys)
         self.layout.addWidget(self.api_keys_button)
@@ -789,7 +2547,7 @@ class SettingsWidget(QWidget):
 
     def update_fps(self, value):
         global fps
-        fps = value
+        fps = int(value)
         set_setting("fps", fps)
 
     def update_scale(self, value):
@@ -830,6 +2588,42 @@ class SettingsWidget(QWidget):
         self.audio_padding_label.setText(f"Audio padding ({audio_padding}ms):")
         set_setting("audio_padding", audio_padding)
 
+    def update_normalize_loudness(self):
+        global normalize_loudness
+        normalize_loudness = self.loudness_checkbox.isChecked()
+        set_setting("normalize_loudness", "1" if normalize_loudness else "0")
+
+    def update_fit_to_audio(self):
+        global fit_to_audio
+        fit_to_audio = self.fit_to_audio_checkbox.isChecked()
+        set_setting("fit_to_audio", "1" if fit_to_audio else "0")
+
+    def update_profiles(self):
+        output_profiles.clear()
+        for checkbox in self.profile_checkboxes:
+            if checkbox.isChecked():
+                output_profiles.append(checkbox.text())
+        set_setting("output_profiles", ",".join(output_profiles))
+
+    def update_remote_cache(self):
+        location = self.remote_cache_edit.text().strip()
+        set_artifact_store(location)
+        set_setting("remote_cache", location)
+
+    def update_coordinator(self):
+        host, _, port = self.coordinator_edit.text().strip().rpartition(":")
+        if port and not port.isdigit():
+            QMessageBox.warning(self, "Warning", "The port must be a number")
+            return
+        try:
+            set_coordinator(int(port) if port else None, host or COORDINATOR_HOST)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        self.coordinator_token_edit.setText(coordinator.token if coordinator is not None else "")
+        set_setting("coordinator_port", port)
+        set_setting("coordinator_host", host)
+
     def show_api_keys(self):
         api_keys_window = ApiKeysWindow()
         api_keys_window.exec()
@@ -867,6 +2661,7 @@ class SracreWindow(QMainWindow):
         self.editor_layout.addWidget(self.editor_group, 2)
 
         self.list_widget = EditorWidget()
+        self.list_widget.project_loaded.connect(self.reload_settings)
         self.editor_group_layout.addWidget(self.list_widget)
 
         self.language_group = QGroupBox("Settings")
@@ -880,10 +2675,17 @@ class SracreWindow(QMainWindow):
         print("Welcome to sracre! Waiting for work...")
         self.show()
 
+    def reload_settings(self):
+        self.language_group_layout.removeWidget(self.languages_widget)
+        self.languages_widget.deleteLater()
+        self.languages_widget = SettingsWidget()
+        self.language_group_layout.addWidget(self.languages_widget)
+
     def closeEvent(self, event):
         if QMessageBox.question(self, "Confirm Exit", "Are you sure you want to exit?",
                                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                 QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes:
+            self.list_widget.cancel_all()
             event.accept()
         else:
             event.ignore()
@@ -893,17 +2695,7 @@ class SracreApp(QApplication):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        for directory in OUT_DIRS:
-            os.makedirs(directory, exist_ok=True)
-
-        cursor = db.cursor()
-        cursor.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)")
-        cursor.execute("CREATE TABLE IF NOT EXISTS keys (api TEXT, key TEXT, quota_used INTEGER, "
-                       "quota_total INTEGER, reset_time INTEGER)")
-        cursor.execute("CREATE TABLE IF NOT EXISTS translations (text_hash TEXT, target_lang TEXT, target_text "
-                       "TEXT, PRIMARY KEY (text_hash, target_lang))")
-        db.commit()
-
+        init_storage()
         while True:
             try:
                 set_keys()
@@ -911,30 +2703,82 @@ class SracreApp(QApplication):
             except Keychain.Error:
                 show_api_keys()
 
-        settings = get_settings()
-        global source_language, selected_languages, fps, scale, voice, video_length, fade_duration, audio_padding
-        if "source_language" in settings:
-            source_language = settings["source_language"]
-        if "selected_languages" in settings:
-            languages = settings["selected_languages"].split(",")
-            if languages != [""]:
-                selected_languages = languages
-        if "fps" in settings:
-            fps = settings["fps"]
-        if "scale" in settings:
-            scale = float(settings["scale"])
-        if "voice" in settings:
-            voice = settings["voice"]
-        if "video_length" in settings:
-            video_length = int(settings["video_length"])
-        if "fade_duration" in settings:
-            fade_duration = float(settings["fade_duration"])
-        if "audio_padding" in settings:
-            audio_padding = float(settings["audio_padding"])
+        load_settings()
 
         self.window = SracreWindow()
         self.window.show()
 
 
+def main():
+    parser = argparse.ArgumentParser(prog="sracre")
+    subparsers = parser.add_subparsers(dest="command")
+
+    cache_server_parser = subparsers.add_parser("cache-server", help="serve a shared artifact cache over HTTP")
+    cache_server_parser.add_argument("--root", default="cache", help="directory to store artifacts in")
+    cache_server_parser.add_argument("--host", default="0.0.0.0")
+    cache_server_parser.add_argument("--port", type=int, default=8765)
+
+    worker_parser = subparsers.add_parser("worker", help="render clips for a coordinator")
+    worker_parser.add_argument("coordinator", help="coordinator URL, e.g. http://host:8766")
+    worker_parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}")
+    worker_parser.add_argument("--cpus", type=int, default=resource_governor.cpus,
+                               help="CPUs this worker may use, split them when running several on one machine")
+    worker_parser.add_argument("--token", default=os.environ.get("SRACRE_TOKEN"),
+                               help="token shown in the coordinator's settings, defaults to $SRACRE_TOKEN")
+
+    render_parser = subparsers.add_parser("render", help="render projects without the GUI")
+    render_parser.add_argument("projects", nargs="+",
+                               help=f"a text file followed by its images, or {PROJECT_EXT} project files, project directories "
+                                    "(each with one .txt file and its images) or directories of such projects")
+    render_parser.add_argument("--source-language", help="overrides the saved source language")
+    render_parser.add_argument("--languages", help="comma separated target languages, overrides the saved ones")
+    render_parser.add_argument("--voice", help="overrides the saved voice")
+    render_parser.add_argument("--profiles", help=f"comma separated output formats ({', '.join(OUTPUT_PROFILES)})")
+    render_parser.add_argument("--json", action="store_true", help="print progress as JSON lines on stdout")
+    render_parser.add_argument("--plan", action="store_true",
+                               help="only estimate the quota and time needed, without rendering anything")
+
+    add_key_parser = subparsers.add_parser("add-key", help="add an API key")
+    add_key_parser.add_argument("api", choices=["deepl", "elevenlabs"])
+    add_key_parser.add_argument("key")
+
+    args = parser.parse_args()
+    if args.command == "add-key":
+        init_storage()
+        keychain, quota = (deepl_keychain, DEEPL_QUOTA) if args.api == "deepl" else (elevenlabs_keychain, ELEVENLABS_QUOTA)
+        keychain.add_key(db, args.key, quota)
+        return 0
+    if args.command == "render":
+        init_storage()
+        load_settings()
+        overrides = {}
+        if args.source_language:
+            overrides["source_language"] = args.source_language
+        if args.languages is not None:
+            overrides["selected_languages"] = [lang for lang in args.languages.split(",") if lang]
+        if args.voice:
+            overrides["voice"] = args.voice
+        if args.profiles:
+            overrides["output_profiles"] = [profile for profile in args.profiles.split(",") if profile]
+            if not all(profile in OUTPUT_PROFILES for profile in overrides["output_profiles"]):
+                parser.error(f"Output formats must be some of: {', '.join(OUTPUT_PROFILES)}")
+        apply_render_settings(overrides, PROJECT_SETTINGS)
+        try:
+            set_keys()
+        except Keychain.Error as e:
+            parser.error(f"{e}, add them with \"sracre.py add-key\"")
+        with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+            return render_batch(args.projects, args.json, args.plan, overrides)
+    if args.command == "cache-server":
+        return serve_artifacts(args.root, args.host, args.port)
+    if args.command == "worker":
+        if not args.token:
+            parser.error("the worker needs the coordinator's token, pass --token or set SRACRE_TOKEN")
+        init_storage()
+        resource_governor.cpus = max(1, args.cpus)
+        return run_worker(args.coordinator, args.name, args.token)
+    return SracreApp(sys.argv).exec()
+
+
 if __name__ == '__main__':
-    sys.exit(SracreApp(sys.argv).exec())
+    sys.exit(main())